@@ -22,7 +22,6 @@ from danswer.chat.personas import build_system_text_from_persona
 from danswer.chat.tools import call_tool
 from danswer.configs.app_configs import NUM_DOCUMENT_TOKENS_FED_TO_CHAT
 from danswer.configs.chat_configs import FORCE_TOOL_PROMPT
-from danswer.configs.constants import IGNORE_FOR_QA
 from danswer.configs.model_configs import GEN_AI_MAX_INPUT_TOKENS
 from danswer.db.models import ChatMessage
 from danswer.db.models import Persona
@@ -31,6 +30,7 @@ from danswer.direct_qa.interfaces import DanswerAnswerPiece
 from danswer.direct_qa.interfaces import DanswerChatModelOut
 from danswer.direct_qa.interfaces import StreamingError
 from danswer.direct_qa.qa_utils import get_usable_chunks
+from danswer.direct_qa.qa_utils import is_ignored_for_qa
 from danswer.document_index import get_default_document_index
 from danswer.indexing.models import InferenceChunk
 from danswer.llm.build import get_default_llm
@@ -150,14 +150,12 @@ def danswer_chat_retrieval(
     if unranked_chunks:
         ranked_chunks.extend(unranked_chunks)
 
-    filtered_ranked_chunks = [
-        chunk for chunk in ranked_chunks if not chunk.metadata.get(IGNORE_FOR_QA)
-    ]
-
-    # get all chunks that fit into the token limit
+    # get all chunks that fit into the token limit, skipping chunks marked as
+    # not applicable for QA
     usable_chunks = get_usable_chunks(
-        chunks=filtered_ranked_chunks,
+        chunks=ranked_chunks,
         token_limit=NUM_DOCUMENT_TOKENS_FED_TO_CHAT,
+        skip_chunk=is_ignored_for_qa,
     )
 
     return usable_chunks
@@ -164,6 +164,11 @@ DISABLE_TIME_FILTER_EXTRACTION = (
 # 1 edit per 2 characters, currently unused due to fuzzy match being too slow
 QUOTE_ALLOWED_ERROR_PERCENT = 0.05
 QA_TIMEOUT = int(os.environ.get("QA_TIMEOUT") or "60")  # 60 seconds
+# How long a user's search ACL filters are reused before being rebuilt, set to 0 to
+# always rebuild. Access changes (e.g. user group updates) apply within this window
+ACL_FILTERS_CACHE_TTL_SECONDS = float(
+    os.environ.get("ACL_FILTERS_CACHE_TTL_SECONDS") or 30
+)
 # Include additional document/chunk metadata in prompt to GenerativeAI
 INCLUDE_METADATA = False
 HARD_DELETE_CHATS = os.environ.get("HARD_DELETE_CHATS", "True").lower() != "false"
@@ -54,6 +54,15 @@ SEARCH_DISTANCE_CUTOFF = 0
 
 # Intent model max context size
 QUERY_MAX_CONTEXT_SIZE = 256
+# Concurrent intent model requests are coalesced into a single batched forward pass.
+# A batch is closed once it hits the max size or the wait window (in ms) runs out
+INTENT_BATCH_MAX_SIZE = int(os.environ.get("INTENT_BATCH_MAX_SIZE") or 32)
+INTENT_BATCH_MAX_WAIT_MS = float(os.environ.get("INTENT_BATCH_MAX_WAIT_MS") or 5)
+# XLA compile the intent model. XLA compiles once per input shape so the first query
+# of each new batch size / length bucket is slow
+INTENT_MODEL_JIT_COMPILE = (
+    os.environ.get("INTENT_MODEL_JIT_COMPILE", "").lower() == "true"
+)
 
 
 #####
@@ -172,6 +172,8 @@ def handle_message(
                 answer_generation_timeout=answer_generation_timeout,
                 real_time_flow=False,
                 enable_reflexion=reflexion,
+                # the bot always answers, it has no use for the predicted flow
+                predict_search_flow=False,
             )
             if not answer.error_msg:
                 return answer
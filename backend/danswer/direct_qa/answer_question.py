@@ -1,11 +1,14 @@
 from collections.abc import Callable
+from functools import partial
+from typing import Any
+from uuid import UUID
 
 from sqlalchemy.orm import Session
 
 from danswer.configs.app_configs import DISABLE_GENERATIVE_AI
 from danswer.configs.app_configs import NUM_DOCUMENT_TOKENS_FED_TO_GENERATIVE_MODEL
 from danswer.configs.app_configs import QA_TIMEOUT
-from danswer.configs.constants import IGNORE_FOR_QA
+from danswer.db.engine import get_sqlalchemy_engine
 from danswer.db.feedback import create_query_event
 from danswer.db.feedback import update_query_event_retrieved_documents
 from danswer.db.models import User
@@ -14,6 +17,7 @@ from danswer.direct_qa.exceptions import UnknownModelError
 from danswer.direct_qa.llm_utils import get_default_qa_model
 from danswer.direct_qa.models import LLMMetricsContainer
 from danswer.direct_qa.qa_utils import get_usable_chunks
+from danswer.direct_qa.qa_utils import is_ignored_for_qa
 from danswer.document_index import get_default_document_index
 from danswer.search.access_filters import build_access_filters_for_user
 from danswer.search.danswer_helper import query_intent
@@ -29,11 +33,26 @@ from danswer.secondary_llm_flows.extract_filters import extract_question_time_fi
 from danswer.server.models import QAResponse
 from danswer.server.models import QuestionRequest
 from danswer.utils.logger import setup_logger
+from danswer.utils.threadpool_concurrency import run_functions_in_parallel
+from danswer.utils.threadpool_concurrency import run_in_background
 from danswer.utils.timing import log_function_time
 
 logger = setup_logger()
 
 
+def _record_retrieved_documents(
+    retrieved_document_ids: list[str], query_id: int, user_id: UUID | None
+) -> None:
+    # Runs in the background, possibly after the request's DB session is closed
+    with Session(get_sqlalchemy_engine(), expire_on_commit=False) as db_session:
+        update_query_event_retrieved_documents(
+            db_session=db_session,
+            retrieved_document_ids=retrieved_document_ids,
+            query_id=query_id,
+            user_id=user_id,
+        )
+
+
 @log_function_time()
 def answer_qa_query(
     question: QuestionRequest,
@@ -43,6 +62,7 @@ def answer_qa_query(
     answer_generation_timeout: int = QA_TIMEOUT,
     real_time_flow: bool = True,
     enable_reflexion: bool = False,
+    predict_search_flow: bool = True,
     retrieval_metrics_callback: Callable[[RetrievalMetricsContainer], None]
     | None = None,
     rerank_metrics_callback: Callable[[RerankMetricsContainer], None] | None = None,
@@ -56,14 +76,6 @@ def answer_qa_query(
     question.filters.time_cutoff = time_cutoff
     filters = question.filters
 
-    query_event_id = create_query_event(
-        query=query,
-        search_type=question.search_type,
-        llm_answer=None,
-        user_id=user.id if user is not None else None,
-        db_session=db_session,
-    )
-
     user_id = None if user is None else user.id
     user_acl_filters = build_access_filters_for_user(user, db_session)
     final_filters = IndexFilters(
@@ -79,15 +91,42 @@ def answer_qa_query(
         favor_recent=True if question.favor_recent is None else question.favor_recent,
     )
 
-    # TODO retire this
-    predicted_search, predicted_flow = query_intent(query)
-
-    ranked_chunks, unranked_chunks = search_chunks(
-        query=search_query,
-        document_index=get_default_document_index(),
-        retrieval_metrics_callback=retrieval_metrics_callback,
-        rerank_metrics_callback=rerank_metrics_callback,
-    )
+    # Recording the query event, the intent model and the retrieval are independent
+    # of each other, so run them at the same time rather than one after another.
+    # The DB session is only used by the query event thread while these run
+    parallel_functions: list[Callable[[], Any]] = [
+        partial(
+            create_query_event,
+            query=query,
+            search_type=question.search_type,
+            llm_answer=None,
+            user_id=user_id,
+            db_session=db_session,
+        ),
+        partial(
+            search_chunks,
+            query=search_query,
+            document_index=get_default_document_index(),
+            retrieval_metrics_callback=retrieval_metrics_callback,
+            rerank_metrics_callback=rerank_metrics_callback,
+        ),
+    ]
+    # TODO retire query_intent
+    # The predicted search type / flow are only suggestions for the caller, skip the
+    # intent model entirely if the caller has no use for them
+    if predict_search_flow:
+        parallel_functions.append(partial(query_intent, query))
+
+    parallel_results = run_functions_in_parallel(parallel_functions)
+    query_event_id = parallel_results[0]
+    ranked_chunks, unranked_chunks = parallel_results[1]
+    if predict_search_flow:
+        predicted_search, predicted_flow = parallel_results[2]
+    else:
+        predicted_search = question.search_type
+        predicted_flow = (
+            QueryFlow.SEARCH if disable_generative_answer else QueryFlow.QUESTION_ANSWER
+        )
 
     if not ranked_chunks:
         return QAResponse(
@@ -103,11 +142,13 @@ def answer_qa_query(
         )
 
     top_docs = chunks_to_search_docs(ranked_chunks)
+    top_doc_ids = [doc.document_id for doc in top_docs]
     unranked_top_docs = chunks_to_search_docs(unranked_chunks)
 
-    update_query_event_retrieved_documents(
-        db_session=db_session,
-        retrieved_document_ids=[doc.document_id for doc in top_docs],
+    # Nothing downstream depends on this write, don't hold up the answer for it
+    run_in_background(
+        _record_retrieved_documents,
+        retrieved_document_ids=top_doc_ids,
         query_id=query_event_id,
         user_id=user_id,
     )
@@ -146,18 +187,14 @@ def answer_qa_query(
             error_msg=str(e),
         )
 
-    # remove chunks marked as not applicable for QA (e.g. Google Drive file
-    # types which can't be parsed). These chunks are useful to show in the
-    # search results, but not for QA.
-    filtered_ranked_chunks = [
-        chunk for chunk in ranked_chunks if not chunk.metadata.get(IGNORE_FOR_QA)
-    ]
-
-    # get all chunks that fit into the token limit
+    # get all chunks that fit into the token limit, skipping chunks marked as not
+    # applicable for QA (e.g. Google Drive file types which can't be parsed).
+    # These chunks are useful to show in the search results, but not for QA.
     usable_chunks = get_usable_chunks(
-        chunks=filtered_ranked_chunks,
+        chunks=ranked_chunks,
         token_limit=NUM_DOCUMENT_TOKENS_FED_TO_GENERATIVE_MODEL,
         offset=offset_count,
+        skip_chunk=is_ignored_for_qa,
     )
     logger.debug(
         f"Chunks fed to LLM: {[chunk.semantic_identifier for chunk in usable_chunks]}"
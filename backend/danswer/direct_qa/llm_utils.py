@@ -1,3 +1,4 @@
+from threading import Lock
 from typing import Any
 
 import pkg_resources
@@ -32,6 +33,12 @@ from danswer.utils.logger import setup_logger
 
 logger = setup_logger()
 
+# Building a QA model sets up the underlying LLM client, so built models are reused
+# across requests. Keyed on the model args (a handful of timeouts / flows), each entry
+# also holds the GenAI API key that was current when the model was built
+_QA_MODEL_POOL: dict[tuple[Any, ...], tuple[str | None, QAModel]] = {}
+_QA_MODEL_POOL_LOCK = Lock()
+
 
 def check_model_api_key_is_valid(model_api_key: str) -> bool:
     if not model_api_key:
@@ -63,13 +70,13 @@ def get_default_qa_handler(model: str, real_time_flow: bool = True) -> QAHandler
     return SimpleChatQAHandler()
 
 
-def get_default_qa_model(
-    internal_model: str = INTERNAL_MODEL_VERSION,
-    endpoint: str | None = GEN_AI_ENDPOINT,
-    model_host_type: str | None = GEN_AI_HOST_TYPE,
-    api_key: str | None = GEN_AI_API_KEY,
-    timeout: int = QA_TIMEOUT,
-    real_time_flow: bool = True,
+def _build_qa_model(
+    internal_model: str,
+    endpoint: str | None,
+    model_host_type: str | None,
+    api_key: str | None,
+    timeout: int,
+    real_time_flow: bool,
     **kwargs: Any,
 ) -> QAModel:
     if not api_key:
@@ -142,3 +149,43 @@ def get_default_qa_model(
         )
     else:
         raise UnknownModelError(internal_model)
+
+
+def get_default_qa_model(
+    internal_model: str = INTERNAL_MODEL_VERSION,
+    endpoint: str | None = GEN_AI_ENDPOINT,
+    model_host_type: str | None = GEN_AI_HOST_TYPE,
+    api_key: str | None = GEN_AI_API_KEY,
+    timeout: int = QA_TIMEOUT,
+    real_time_flow: bool = True,
+    **kwargs: Any,
+) -> QAModel:
+    model_args: dict[str, Any] = {
+        "internal_model": internal_model,
+        "endpoint": endpoint,
+        "model_host_type": model_host_type,
+        "api_key": api_key,
+        "timeout": timeout,
+        "real_time_flow": real_time_flow,
+    }
+    # extra args are model specific and not necessarily hashable, don't pool these
+    if kwargs:
+        return _build_qa_model(**model_args, **kwargs)
+
+    # The key set via the UI can change at any time, a pooled model built with a
+    # different key is replaced so that an updated key is picked up on the next request
+    pool_key = tuple(model_args.values())
+    current_api_key = get_gen_ai_api_key()
+    with _QA_MODEL_POOL_LOCK:
+        pooled = _QA_MODEL_POOL.get(pool_key)
+        if pooled is not None and pooled[0] == current_api_key:
+            return pooled[1]
+
+        qa_model = _build_qa_model(**model_args)
+        # Only QABlocks are pooled, a legacy model here means building the QABlock
+        # failed and the next request should retry it
+        if isinstance(qa_model, QABlock):
+            _QA_MODEL_POOL[pool_key] = (current_api_key, qa_model)
+        else:
+            _QA_MODEL_POOL.pop(pool_key, None)
+    return qa_model
@@ -1,8 +1,10 @@
 import json
 import math
 import re
+from collections.abc import Callable
 from collections.abc import Generator
 from collections.abc import Iterator
+from collections.abc import Sequence
 from json.decoder import JSONDecodeError
 from typing import cast
 from typing import Optional
@@ -13,6 +15,7 @@ import regex
 from danswer.configs.app_configs import NUM_DOCUMENT_TOKENS_FED_TO_GENERATIVE_MODEL
 from danswer.configs.app_configs import QUOTE_ALLOWED_ERROR_PERCENT
 from danswer.configs.constants import GEN_AI_API_KEY_STORAGE_KEY
+from danswer.configs.constants import IGNORE_FOR_QA
 from danswer.configs.model_configs import GEN_AI_API_KEY
 from danswer.direct_qa.interfaces import DanswerAnswer
 from danswer.direct_qa.interfaces import DanswerAnswerPiece
@@ -289,46 +292,76 @@ def simulate_streaming_response(model_out: str) -> Generator[str, None, None]:
         yield token
 
 
+def is_ignored_for_qa(chunk: InferenceChunk) -> bool:
+    """Chunks marked as not applicable for QA (e.g. Google Drive file types which
+    can't be parsed) are useful to show in the search results, but not for QA"""
+    return bool(chunk.metadata.get(IGNORE_FOR_QA))
+
+
 def _get_usable_chunks(
-    chunks: list[InferenceChunk], token_limit: int
-) -> list[InferenceChunk]:
+    chunks: Sequence[InferenceChunk],
+    token_limit: int,
+    start_ind: int = 0,
+    skip_chunk: Callable[[InferenceChunk], bool] | None = None,
+) -> tuple[list[InferenceChunk], int]:
+    """Walks the chunks once starting from start_ind, skipping any chunks matching
+    skip_chunk and stopping as soon as the token limit is reached.
+    Returns the usable chunks and the index to continue from for the next set"""
     total_token_count = 0
-    usable_chunks = []
-    for chunk in chunks:
+    usable_chunks: list[InferenceChunk] = []
+    first_candidate_ind: int | None = None
+    next_ind = len(chunks)
+    for ind in range(start_ind, len(chunks)):
+        chunk = chunks[ind]
+        if skip_chunk is not None and skip_chunk(chunk):
+            continue
+
+        if first_candidate_ind is None:
+            first_candidate_ind = ind
+
         chunk_token_count = check_number_of_tokens(chunk.content)
         if total_token_count + chunk_token_count > token_limit:
+            next_ind = ind
             break
 
         total_token_count += chunk_token_count
         usable_chunks.append(chunk)
 
+    if first_candidate_ind is None:
+        return [], start_ind
+
     # try and return at least one chunk if possible. This chunk will
     # get truncated later on in the pipeline. This would only occur if
     # the first chunk is larger than the token limit (usually due to character
     # count -> token count mismatches caused by special characters / non-ascii
     # languages)
-    if not usable_chunks and chunks:
-        usable_chunks = [chunks[0]]
+    if not usable_chunks:
+        usable_chunks = [chunks[first_candidate_ind]]
+        next_ind = first_candidate_ind + 1
 
-    return usable_chunks
+    return usable_chunks, next_ind
 
 
 def get_usable_chunks(
-    chunks: list[InferenceChunk],
+    chunks: Sequence[InferenceChunk],
     token_limit: int = NUM_DOCUMENT_TOKENS_FED_TO_GENERATIVE_MODEL,
     offset: int = 0,
+    skip_chunk: Callable[[InferenceChunk], bool] | None = None,
 ) -> list[InferenceChunk]:
+    """Chunks matching skip_chunk are dropped in the same pass that applies the token
+    limit, so callers don't need to build a filtered copy of the chunks first"""
     offset_into_chunks = 0
     usable_chunks: list[InferenceChunk] = []
     for _ in range(min(offset + 1, 1)):  # go through this process at least once
-        if offset_into_chunks >= len(chunks) and offset_into_chunks > 0:
+        usable_chunks, offset_into_chunks = _get_usable_chunks(
+            chunks=chunks,
+            token_limit=token_limit,
+            start_ind=offset_into_chunks,
+            skip_chunk=skip_chunk,
+        )
+        if not usable_chunks and offset_into_chunks > 0:
             raise ValueError(
                 "Chunks offset too large, should not retry this many times"
             )
 
-        usable_chunks = _get_usable_chunks(
-            chunks=chunks[offset_into_chunks:], token_limit=token_limit
-        )
-        offset_into_chunks += len(usable_chunks)
-
     return usable_chunks
@@ -1,13 +1,52 @@
+from threading import Lock
+from time import monotonic
+from uuid import UUID
+
 from sqlalchemy.orm import Session
 
 from danswer.access.access import get_acl_for_user
+from danswer.configs.app_configs import ACL_FILTERS_CACHE_TTL_SECONDS
 from danswer.db.models import User
 from danswer.search.models import IndexFilters
 
+_ACL_FILTERS_CACHE_MAX_SIZE = 10_000
+# user id -> (time the filters were built, filters)
+_ACL_FILTERS_CACHE: dict[UUID | None, tuple[float, list[str]]] = {}
+_ACL_FILTERS_CACHE_LOCK = Lock()
+
+
+def _evict_expired_acl_filters(now: float) -> None:
+    expired_user_ids = [
+        user_id
+        for user_id, (built_at, _) in _ACL_FILTERS_CACHE.items()
+        if now - built_at >= ACL_FILTERS_CACHE_TTL_SECONDS
+    ]
+    for user_id in expired_user_ids:
+        del _ACL_FILTERS_CACHE[user_id]
+
 
 def build_access_filters_for_user(user: User | None, session: Session) -> list[str]:
-    user_acl = get_acl_for_user(user, session)
-    return list(user_acl)
+    """The ACL can require DB lookups (e.g. user groups) and rarely changes, so it is
+    reused for the same user for up to ACL_FILTERS_CACHE_TTL_SECONDS"""
+    if ACL_FILTERS_CACHE_TTL_SECONDS <= 0:
+        return list(get_acl_for_user(user, session))
+
+    user_id = user.id if user is not None else None
+    now = monotonic()
+    with _ACL_FILTERS_CACHE_LOCK:
+        cached = _ACL_FILTERS_CACHE.get(user_id)
+    if cached is not None and now - cached[0] < ACL_FILTERS_CACHE_TTL_SECONDS:
+        # copy so that callers modifying the filters don't affect the cache
+        return list(cached[1])
+
+    user_acl_filters = list(get_acl_for_user(user, session))
+    with _ACL_FILTERS_CACHE_LOCK:
+        if len(_ACL_FILTERS_CACHE) >= _ACL_FILTERS_CACHE_MAX_SIZE:
+            _evict_expired_acl_filters(now)
+            if len(_ACL_FILTERS_CACHE) >= _ACL_FILTERS_CACHE_MAX_SIZE:
+                _ACL_FILTERS_CACHE.clear()
+        _ACL_FILTERS_CACHE[user_id] = (now, user_acl_filters)
+    return list(user_acl_filters)
 
 
 def build_user_only_filters(user: User | None, db_session: Session) -> IndexFilters:
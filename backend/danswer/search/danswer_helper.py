@@ -1,12 +1,14 @@
-import numpy as np
-import tensorflow as tf  # type:ignore
+import math
+from functools import lru_cache
+
 from transformers import AutoTokenizer  # type:ignore
 
+from danswer.configs.model_configs import INTENT_BATCH_MAX_SIZE
+from danswer.configs.model_configs import INTENT_BATCH_MAX_WAIT_MS
 from danswer.search.models import QueryFlow
 from danswer.search.models import SearchType
-from danswer.search.search_nlp_models import get_default_intent_model
-from danswer.search.search_nlp_models import get_default_intent_model_tokenizer
 from danswer.search.search_nlp_models import get_default_tokenizer
+from danswer.search.search_nlp_models import IntentBatcher
 from danswer.search.search_runner import remove_stop_words
 from danswer.server.models import HelperResponse
 from danswer.utils.logger import setup_logger
@@ -15,36 +17,32 @@ from danswer.utils.timing import log_function_time
 logger = setup_logger()
 
 
-def count_unk_tokens(text: str, tokenizer: AutoTokenizer) -> int:
+def has_unk_tokens(text: str, tokenizer: AutoTokenizer) -> bool:
     """Unclear if the wordpiece tokenizer used is actually tokenizing anything as the [UNK] token
     It splits up even foreign characters and unicode emojis without using UNK"""
-    tokenized_text = tokenizer.tokenize(text)
-    num_unk_tokens = len(
-        [token for token in tokenized_text if token == tokenizer.unk_token]
-    )
-    logger.debug(f"Total of {num_unk_tokens} UNKNOWN tokens found")
-    return num_unk_tokens
+    return any(token == tokenizer.unk_token for token in tokenizer.tokenize(text))
 
 
-@log_function_time()
-def query_intent(query: str) -> tuple[SearchType, QueryFlow]:
-    tokenizer = get_default_intent_model_tokenizer()
-    intent_model = get_default_intent_model()
-    model_input = tokenizer(query, return_tensors="tf", truncation=True, padding=True)
+# Intent class probability thresholds (20% and 70%), in log space
+_QA_LOG_THRESHOLD = math.log(0.2)
+_CERTAIN_LOG_THRESHOLD = math.log(0.7)
+
+_INTENT_BATCHER = IntentBatcher(
+    max_batch_size=INTENT_BATCH_MAX_SIZE, max_wait_ms=INTENT_BATCH_MAX_WAIT_MS
+)
 
-    predictions = intent_model(model_input)[0]
-    probabilities = tf.nn.softmax(predictions, axis=-1)
-    class_percentages = np.round(probabilities.numpy() * 100, 2)
 
-    keyword, semantic, qa = class_percentages.tolist()[0]
+@lru_cache(maxsize=4096)
+def _query_intent(normalized_query: str) -> tuple[SearchType, QueryFlow]:
+    keyword, semantic, qa = _INTENT_BATCHER.predict(normalized_query)
 
     # Heavily bias towards QA, from user perspective, answering a statement is not as bad as not answering a question
-    if qa > 20:
+    if qa > _QA_LOG_THRESHOLD:
         # If one class is very certain, choose it still
-        if keyword > 70:
+        if keyword > _CERTAIN_LOG_THRESHOLD:
             predicted_search = SearchType.KEYWORD
             predicted_flow = QueryFlow.SEARCH
-        elif semantic > 70:
+        elif semantic > _CERTAIN_LOG_THRESHOLD:
             predicted_search = SearchType.SEMANTIC
             predicted_flow = QueryFlow.SEARCH
         # If it's a QA question, it must be a "Semantic" style statement/question
@@ -59,6 +57,15 @@ def query_intent(query: str) -> tuple[SearchType, QueryFlow]:
         predicted_search = SearchType.SEMANTIC
         predicted_flow = QueryFlow.SEARCH
 
+    return predicted_search, predicted_flow
+
+
+@log_function_time()
+def query_intent(query: str) -> tuple[SearchType, QueryFlow]:
+    # The intent model is uncased and ignores surrounding whitespace, so normalizing
+    # doesn't change the prediction but lets repeated queries hit the cache
+    predicted_search, predicted_flow = _query_intent(query.strip().lower())
+
     logger.debug(f"Predicted Search: {predicted_search}")
     logger.debug(f"Predicted Flow: {predicted_flow}")
     return predicted_search, predicted_flow
@@ -75,10 +82,11 @@ def recommend_search_flow(
     # Heuristics based decisions
     words = query.split()
     non_stopwords = remove_stop_words(query)
-    non_stopword_percent = len(non_stopwords) / len(words)
+    # empty or whitespace only queries have no words to judge stopwords on
+    non_stopword_percent = len(non_stopwords) / len(words) if words else 1.0
 
     # UNK tokens -> suggest Keyword (still may be valid QA)
-    if count_unk_tokens(query, get_default_tokenizer()) > 0:
+    if has_unk_tokens(query, get_default_tokenizer()):
         if not keyword:
             heuristic_search_type = SearchType.KEYWORD
             message = "Unknown tokens in query."
@@ -1,22 +1,41 @@
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from queue import Empty
+from queue import Queue
+from threading import Lock
+from threading import Thread
+from typing import Any
+from typing import TYPE_CHECKING
+
+import numpy as np
 from sentence_transformers import CrossEncoder  # type: ignore
 from sentence_transformers import SentenceTransformer  # type: ignore
 from transformers import AutoTokenizer  # type: ignore
-from transformers import TFDistilBertForSequenceClassification  # type: ignore
 
 from danswer.configs.model_configs import CROSS_EMBED_CONTEXT_SIZE
 from danswer.configs.model_configs import CROSS_ENCODER_MODEL_ENSEMBLE
 from danswer.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from danswer.configs.model_configs import DOCUMENT_ENCODER_MODEL
+from danswer.configs.model_configs import INTENT_MODEL_JIT_COMPILE
 from danswer.configs.model_configs import INTENT_MODEL_VERSION
 from danswer.configs.model_configs import QUERY_MAX_CONTEXT_SIZE
 from danswer.configs.model_configs import SKIP_RERANKING
+from danswer.utils.logger import setup_logger
 
+logger = setup_logger()
+
+# TensorFlow is only needed for the intent model, it is imported when that model is
+# first loaded so that processes which never use it (e.g. indexing) don't pay for it
+if TYPE_CHECKING:
+    from transformers import TFDistilBertForSequenceClassification  # type: ignore
 
 _TOKENIZER: None | AutoTokenizer = None
 _EMBED_MODEL: None | SentenceTransformer = None
 _RERANK_MODELS: None | list[CrossEncoder] = None
 _INTENT_TOKENIZER: None | AutoTokenizer = None
-_INTENT_MODEL: None | TFDistilBertForSequenceClassification = None
+_INTENT_MODEL: "None | TFDistilBertForSequenceClassification" = None
+_INTENT_MODEL_FN: None | Callable[[Any, Any], Any] = None
 
 
 def get_default_tokenizer() -> AutoTokenizer:
@@ -52,9 +71,11 @@ def get_default_intent_model_tokenizer() -> AutoTokenizer:
     return _INTENT_TOKENIZER
 
 
-def get_default_intent_model() -> TFDistilBertForSequenceClassification:
+def get_default_intent_model() -> "TFDistilBertForSequenceClassification":
     global _INTENT_MODEL
     if _INTENT_MODEL is None:
+        from transformers import TFDistilBertForSequenceClassification  # type: ignore
+
         _INTENT_MODEL = TFDistilBertForSequenceClassification.from_pretrained(
             INTENT_MODEL_VERSION
         )
@@ -62,6 +83,126 @@ def get_default_intent_model() -> TFDistilBertForSequenceClassification:
     return _INTENT_MODEL
 
 
+def get_default_intent_model_fn() -> Callable[[Any, Any], Any]:
+    """Intent model forward pass traced into a single TF graph instead of running the
+    Keras model eagerly op by op. Takes the input ids and attention mask and returns
+    the logits. If INTENT_MODEL_JIT_COMPILE is set, the graph is compiled with XLA so
+    the matmuls / softmaxes / reductions get fused"""
+    global _INTENT_MODEL_FN
+    if _INTENT_MODEL_FN is None:
+        import tensorflow as tf  # type: ignore
+
+        intent_model = get_default_intent_model()
+
+        @tf.function(
+            input_signature=[
+                tf.TensorSpec(shape=[None, None], dtype=tf.int32, name="input_ids"),
+                tf.TensorSpec(
+                    shape=[None, None], dtype=tf.int32, name="attention_mask"
+                ),
+            ],
+            jit_compile=INTENT_MODEL_JIT_COMPILE,
+        )
+        def _intent_model_fn(input_ids: tf.Tensor, attention_mask: tf.Tensor) -> Any:
+            return intent_model(
+                input_ids=input_ids, attention_mask=attention_mask, training=False
+            ).logits
+
+        _INTENT_MODEL_FN = _intent_model_fn
+    return _INTENT_MODEL_FN
+
+
+def tokenize_intent_model_input(queries: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Tokenizes the queries into the int32 input ids and attention mask that the intent
+    model function takes. Used both at query time and by the warm up so that they pad to
+    the same shapes, XLA compiles the model once per input shape"""
+    # NumPy outputs skip building eager TF tensors in the tokenizer, the traced model
+    # function converts its inputs itself
+    model_input = get_default_intent_model_tokenizer()(
+        queries,
+        return_tensors="np",
+        truncation=True,
+        padding=True,
+        # bucket the lengths to bound how many shapes XLA has to compile for
+        pad_to_multiple_of=16 if INTENT_MODEL_JIT_COMPILE else None,
+    )
+    return (
+        model_input["input_ids"].astype(np.int32),
+        model_input["attention_mask"].astype(np.int32),
+    )
+
+
+def _predict_intent_log_probabilities(queries: list[str]) -> np.ndarray:
+    """Runs a single padded forward pass of the intent model over all the queries.
+    Returns the (keyword, semantic, qa) class log probabilities, one row per query"""
+    input_ids, attention_mask = tokenize_intent_model_input(queries)
+    logits = np.asarray(get_default_intent_model_fn()(input_ids, attention_mask))
+    # Only 3 classes, a log softmax in NumPy is cheaper than dispatching it to TF.
+    # The probabilities are only compared against fixed thresholds, so they are
+    # kept in log space rather than exponentiated back
+    shifted_logits = logits - logits.max(axis=-1, keepdims=True)
+    return shifted_logits - np.log(np.exp(shifted_logits).sum(axis=-1, keepdims=True))
+
+
+class IntentBatcher:
+    """Coalesces concurrent intent model requests into a single batched forward pass.
+    Running the model one query at a time is dominated by loading the model weights,
+    so sharing a pass across all the queries that arrive within a short window is
+    nearly free compared to running them separately."""
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self._queue: Queue[tuple[str, Future[np.ndarray]]] = Queue()
+        self._worker: Thread | None = None
+        self._worker_lock = Lock()
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = Thread(target=self._run, daemon=True)
+                self._worker.start()
+
+    def _next_batch(self) -> list[tuple[str, Future[np.ndarray]]]:
+        # block until there is at least one query to process
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # window is over, still pick up anything that is already waiting
+                    batch.append(self._queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                log_probabilities = _predict_intent_log_probabilities(
+                    [query for query, _ in batch]
+                )
+            except Exception as e:
+                logger.exception("Failed to run intent model on batch")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            logger.debug(f"Ran intent model on batch of {len(batch)} queries")
+            for (_, future), query_log_probabilities in zip(batch, log_probabilities):
+                future.set_result(query_log_probabilities)
+
+    def predict(self, query: str) -> np.ndarray:
+        self._ensure_worker()
+        future: Future[np.ndarray] = Future()
+        self._queue.put((query, future))
+        return future.result()
+
+
 def warm_up_models(
     indexer_only: bool = False, skip_cross_encoders: bool = SKIP_RERANKING
 ) -> None:
@@ -79,8 +220,6 @@ def warm_up_models(
             for cross_encoder in cross_encoders
         ]
 
-    intent_tokenizer = get_default_intent_model_tokenizer()
-    inputs = intent_tokenizer(
-        warm_up_str, return_tensors="tf", truncation=True, padding=True
-    )
-    get_default_intent_model()(inputs)
+    # Goes through the same tokenization and traced function used by query_intent so
+    # that the graph tracing (and XLA compile) is not paid by the first query
+    get_default_intent_model_fn()(*tokenize_intent_model_input([warm_up_str]))
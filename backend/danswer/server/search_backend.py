@@ -11,7 +11,6 @@ from danswer.auth.users import current_admin_user
 from danswer.auth.users import current_user
 from danswer.configs.app_configs import DISABLE_GENERATIVE_AI
 from danswer.configs.app_configs import NUM_DOCUMENT_TOKENS_FED_TO_GENERATIVE_MODEL
-from danswer.configs.constants import IGNORE_FOR_QA
 from danswer.db.engine import get_session
 from danswer.db.feedback import create_doc_retrieval_feedback
 from danswer.db.feedback import create_query_event
@@ -25,6 +24,7 @@ from danswer.direct_qa.interfaces import DanswerAnswerPiece
 from danswer.direct_qa.interfaces import StreamingError
 from danswer.direct_qa.llm_utils import get_default_qa_model
 from danswer.direct_qa.qa_utils import get_usable_chunks
+from danswer.direct_qa.qa_utils import is_ignored_for_qa
 from danswer.document_index import get_default_document_index
 from danswer.document_index.vespa.index import VespaIndex
 from danswer.search.access_filters import build_access_filters_for_user
@@ -308,18 +308,13 @@ def stream_direct_qa(
             yield get_json_line(error.dict())
             return
 
-        # remove chunks marked as not applicable for QA (e.g. Google Drive file
-        # types which can't be parsed). These chunks are useful to show in the
-        # search results, but not for QA.
-        filtered_ranked_chunks = [
-            chunk for chunk in ranked_chunks if not chunk.metadata.get(IGNORE_FOR_QA)
-        ]
-
-        # get all chunks that fit into the token limit
+        # get all chunks that fit into the token limit, skipping chunks marked as
+        # not applicable for QA (e.g. Google Drive file types which can't be parsed)
         usable_chunks = get_usable_chunks(
-            chunks=filtered_ranked_chunks,
+            chunks=ranked_chunks,
             token_limit=NUM_DOCUMENT_TOKENS_FED_TO_GENERATIVE_MODEL,
             offset=offset_count,
+            skip_chunk=is_ignored_for_qa,
         )
         logger.debug(
             f"Chunks fed to LLM: {[chunk.semantic_identifier for chunk in usable_chunks]}"
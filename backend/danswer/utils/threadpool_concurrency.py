@@ -0,0 +1,52 @@
+import concurrent.futures
+from collections.abc import Callable
+from typing import Any
+
+from danswer.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Shared pool for work that the caller should not have to wait on
+_BACKGROUND_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=4, thread_name_prefix="danswer_background"
+)
+
+
+def run_functions_in_parallel(function_calls: list[Callable[[], Any]]) -> list[Any]:
+    """Runs the given zero-argument callables (use functools.partial to bind args)
+    in separate threads and returns their results in the same order as the input.
+    If any of the calls raise, the exception is re-raised in the calling thread."""
+    if not function_calls:
+        return []
+
+    results: list[Any] = [None] * len(function_calls)
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(function_calls)
+    ) as executor:
+        future_to_index = {
+            executor.submit(function_call): ind
+            for ind, function_call in enumerate(function_calls)
+        }
+        for future in concurrent.futures.as_completed(future_to_index):
+            results[future_to_index[future]] = future.result()
+
+    return results
+
+
+def run_in_background(
+    func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> concurrent.futures.Future:
+    """Submits the function to a shared thread pool and returns right away.
+    Since nothing may ever wait on the result, failures are logged here"""
+
+    def _log_failure(future: concurrent.futures.Future) -> None:
+        exception = future.exception()
+        if exception is not None:
+            logger.error(
+                f"Background call to {func.__name__} failed",
+                exc_info=exception,
+            )
+
+    future = _BACKGROUND_EXECUTOR.submit(func, *args, **kwargs)
+    future.add_done_callback(_log_failure)
+    return future
@@ -1,6 +1,10 @@
 import textwrap
 import unittest
+from unittest.mock import patch
 
+from danswer.configs.constants import IGNORE_FOR_QA
+from danswer.direct_qa.qa_utils import get_usable_chunks
+from danswer.direct_qa.qa_utils import is_ignored_for_qa
 from danswer.direct_qa.qa_utils import match_quotes_to_docs
 from danswer.direct_qa.qa_utils import separate_answer_quotes
 from danswer.indexing.models import InferenceChunk
@@ -195,5 +199,71 @@ class TestQAPostprocessing(unittest.TestCase):
         )
 
 
+def _make_chunk(
+    document_id: str, content: str, ignore_for_qa: bool = False
+) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=document_id,
+        source_type="testing",
+        chunk_id=0,
+        content=content,
+        source_links=None,
+        blurb="anything",
+        semantic_identifier="anything",
+        section_continuation=False,
+        recency_bias=1,
+        boost=0,
+        hidden=False,
+        score=1,
+        metadata={IGNORE_FOR_QA: True} if ignore_for_qa else {},
+        match_highlights=[],
+        updated_at=None,
+    )
+
+
+# count whitespace separated words as tokens to keep the tests independent of the tokenizer
+@patch(
+    "danswer.direct_qa.qa_utils.check_number_of_tokens",
+    new=lambda text: len(text.split()),
+)
+class TestGetUsableChunks(unittest.TestCase):
+    def test_token_limit(self) -> None:
+        chunks = [
+            _make_chunk("doc 0", "one two three"),
+            _make_chunk("doc 1", "four five"),
+            _make_chunk("doc 2", "six seven"),
+        ]
+        usable_chunks = get_usable_chunks(chunks, token_limit=5)
+        self.assertEqual([c.document_id for c in usable_chunks], ["doc 0", "doc 1"])
+
+    def test_skip_chunk(self) -> None:
+        chunks = [
+            _make_chunk("doc 0", "one two three", ignore_for_qa=True),
+            _make_chunk("doc 1", "four five"),
+            _make_chunk("doc 2", "six seven eight", ignore_for_qa=True),
+            _make_chunk("doc 3", "nine ten"),
+            _make_chunk("doc 4", "eleven twelve"),
+        ]
+        usable_chunks = get_usable_chunks(
+            chunks,
+            token_limit=5,
+            skip_chunk=is_ignored_for_qa,
+        )
+        self.assertEqual([c.document_id for c in usable_chunks], ["doc 1", "doc 3"])
+
+    def test_first_chunk_over_limit(self) -> None:
+        chunks = [
+            _make_chunk("doc 0", "one two", ignore_for_qa=True),
+            _make_chunk("doc 1", "three four five six"),
+            _make_chunk("doc 2", "seven"),
+        ]
+        usable_chunks = get_usable_chunks(
+            chunks,
+            token_limit=3,
+            skip_chunk=is_ignored_for_qa,
+        )
+        self.assertEqual([c.document_id for c in usable_chunks], ["doc 1"])
+
+
 if __name__ == "__main__":
     unittest.main()
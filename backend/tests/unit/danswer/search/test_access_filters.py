@@ -0,0 +1,106 @@
+import unittest
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+from danswer.search import access_filters
+from danswer.search.access_filters import build_access_filters_for_user
+
+
+def _make_user() -> Any:
+    return MagicMock(id=uuid4())
+
+
+class TestBuildAccessFiltersForUser(unittest.TestCase):
+    def setUp(self) -> None:
+        access_filters._ACL_FILTERS_CACHE.clear()
+        self.addCleanup(access_filters._ACL_FILTERS_CACHE.clear)
+        self.now = 1000.0
+        self.db_session = MagicMock()
+
+        patchers = [
+            patch(
+                "danswer.search.access_filters.get_acl_for_user",
+                side_effect=lambda user, _: {f"user_id:{user.id}"},
+            ),
+            patch(
+                "danswer.search.access_filters.monotonic",
+                side_effect=lambda: self.now,
+            ),
+            patch("danswer.search.access_filters.ACL_FILTERS_CACHE_TTL_SECONDS", 30),
+            patch("danswer.search.access_filters._ACL_FILTERS_CACHE_MAX_SIZE", 3),
+        ]
+        self.mock_get_acl_for_user = patchers[0].start()
+        for patcher in patchers[1:]:
+            patcher.start()
+        for patcher in patchers:
+            self.addCleanup(patcher.stop)
+
+    def test_reused_within_ttl(self) -> None:
+        user = _make_user()
+        first = build_access_filters_for_user(user, self.db_session)
+        self.now += 29
+        second = build_access_filters_for_user(user, self.db_session)
+
+        self.assertEqual(first, [f"user_id:{user.id}"])
+        self.assertEqual(first, second)
+        self.assertEqual(self.mock_get_acl_for_user.call_count, 1)
+
+    def test_rebuilt_after_ttl(self) -> None:
+        user = _make_user()
+        build_access_filters_for_user(user, self.db_session)
+        self.now += 30
+        build_access_filters_for_user(user, self.db_session)
+
+        self.assertEqual(self.mock_get_acl_for_user.call_count, 2)
+
+    def test_cache_disabled(self) -> None:
+        user = _make_user()
+        with patch("danswer.search.access_filters.ACL_FILTERS_CACHE_TTL_SECONDS", 0):
+            build_access_filters_for_user(user, self.db_session)
+            build_access_filters_for_user(user, self.db_session)
+
+        self.assertEqual(self.mock_get_acl_for_user.call_count, 2)
+        self.assertEqual(access_filters._ACL_FILTERS_CACHE, {})
+
+    def test_max_size_evicts_expired(self) -> None:
+        expired_user = _make_user()
+        build_access_filters_for_user(expired_user, self.db_session)
+        self.now += 30
+        live_users = [_make_user(), _make_user()]
+        for user in live_users:
+            build_access_filters_for_user(user, self.db_session)
+
+        # Cache is full, only the expired entry is dropped to make room
+        new_user = _make_user()
+        build_access_filters_for_user(new_user, self.db_session)
+        self.assertEqual(
+            set(access_filters._ACL_FILTERS_CACHE),
+            {user.id for user in live_users + [new_user]},
+        )
+
+    def test_max_size_clears_when_nothing_expired(self) -> None:
+        for _ in range(3):
+            build_access_filters_for_user(_make_user(), self.db_session)
+
+        new_user = _make_user()
+        build_access_filters_for_user(new_user, self.db_session)
+        self.assertEqual(set(access_filters._ACL_FILTERS_CACHE), {new_user.id})
+
+    def test_returned_filters_are_copies(self) -> None:
+        user = _make_user()
+        first = build_access_filters_for_user(user, self.db_session)
+        first.append("injected")
+        second = build_access_filters_for_user(user, self.db_session)
+        second.append("injected")
+
+        self.assertEqual(
+            build_access_filters_for_user(user, self.db_session),
+            [f"user_id:{user.id}"],
+        )
+        self.assertEqual(self.mock_get_acl_for_user.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
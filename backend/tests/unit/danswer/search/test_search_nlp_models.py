@@ -0,0 +1,94 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+
+from danswer.search.search_nlp_models import IntentBatcher
+
+
+def _stub_tokenizer(queries: list[str], **kwargs: Any) -> dict[str, np.ndarray]:
+    # Queries are numbers, the id of each row is the query itself so that the rows
+    # can be traced back to their callers
+    input_ids = np.array([[int(query), 0] for query in queries], dtype=np.int64)
+    return {"input_ids": input_ids, "attention_mask": np.ones_like(input_ids)}
+
+
+class TestIntentBatcher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.batch_sizes: list[int] = []
+        self.fail_next_batch = False
+
+        tokenizer_patcher = patch(
+            "danswer.search.search_nlp_models.get_default_intent_model_tokenizer",
+            return_value=_stub_tokenizer,
+        )
+        model_fn_patcher = patch(
+            "danswer.search.search_nlp_models.get_default_intent_model_fn",
+            return_value=self._stub_model_fn,
+        )
+        tokenizer_patcher.start()
+        model_fn_patcher.start()
+        self.addCleanup(tokenizer_patcher.stop)
+        self.addCleanup(model_fn_patcher.stop)
+
+    def _stub_model_fn(
+        self, input_ids: np.ndarray, attention_mask: np.ndarray
+    ) -> np.ndarray:
+        self.batch_sizes.append(len(input_ids))
+        if self.fail_next_batch:
+            self.fail_next_batch = False
+            raise RuntimeError("model failure")
+        # keyword - qa logit difference is the query, log softmax keeps differences
+        logits = np.zeros((len(input_ids), 3), dtype=np.float32)
+        logits[:, 0] = input_ids[:, 0]
+        return logits
+
+    @staticmethod
+    def _query_from_row(row: np.ndarray) -> int:
+        return round(float(row[0] - row[2]))
+
+    def test_concurrent_queries_are_batched(self) -> None:
+        batcher = IntentBatcher(max_batch_size=8, max_wait_ms=1000)
+        queries = [str(i) for i in range(20)]
+
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            results = list(executor.map(batcher.predict, queries))
+
+        self.assertEqual(sum(self.batch_sizes), len(queries))
+        self.assertLess(len(self.batch_sizes), len(queries))
+        self.assertTrue(all(size <= 8 for size in self.batch_sizes))
+
+        # Every caller gets the row for its own query
+        self.assertEqual(
+            [self._query_from_row(result) for result in results],
+            list(range(len(queries))),
+        )
+        for result in results:
+            self.assertAlmostEqual(float(np.exp(result).sum()), 1.0, places=5)
+
+    def test_model_failure_reaches_whole_batch(self) -> None:
+        batcher = IntentBatcher(max_batch_size=8, max_wait_ms=1000)
+        self.fail_next_batch = True
+
+        def _predict_or_error(query: str) -> np.ndarray | Exception:
+            try:
+                return batcher.predict(query)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(executor.map(_predict_or_error, ["1", "2", "3"]))
+
+        self.assertEqual(self.batch_sizes, [3])
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+
+        # The worker keeps serving later batches
+        self.assertEqual(self._query_from_row(batcher.predict("4")), 4)
+        self.assertEqual(self.batch_sizes, [3, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()